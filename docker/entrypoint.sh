@@ -4,11 +4,10 @@ set -e
 echo "🚀 Starting Unified LaMa + ZITS Pipeline (AWS Enhanced)"
 echo "======================================================="
 
-# Run GPU detection
-python /workspace/gpu_detector.py
-GPU_DETECTED=$?
+# Run GPU detection and export its PIPELINE_* variables to this shell and child processes
+eval "$(python /workspace/gpu_detector.py --export)"
 
-# Source environment variables set by gpu_detector.py
+# Read environment variables exported by gpu_detector.py
 DEVICE=${PIPELINE_DEVICE:-cpu}
 GPU_AVAILABLE=${PIPELINE_GPU_AVAILABLE:-false}
 DOWNLOAD_WEIGHTS=${PIPELINE_DOWNLOAD_WEIGHTS:-false}
@@ -166,7 +165,7 @@ if os.path.exists('/tmp/output_clean.mp4'):
 
 # Upload processed frames directory
 frames_url = '$S3_OUTPUT_LOCATION/processed_frames'
-handler.upload_directory('$ZITS_OUT_DIR', frames_url)
+handler.upload_directory('$ZITS_OUT_DIR', frames_url, manifest_path='/tmp/upload_manifest.jsonl')
 
 print('✅ S3 upload completed')
 "
@@ -180,6 +179,7 @@ print('✅ S3 upload completed')
     echo "   📁 Processed frames: $ZITS_OUT_DIR"
     if [ -n "$S3_OUTPUT_LOCATION" ]; then
         echo "   ☁️  S3 location: $S3_OUTPUT_LOCATION"
+        echo "   📋 Upload manifest: /tmp/upload_manifest.jsonl"
     fi
 else
     echo "   Status: ⚠️  Partial completion - Check logs for issues"
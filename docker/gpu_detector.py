@@ -4,23 +4,28 @@ GPU Detection and Configuration Script
 Detects GPU availability and configures the environment accordingly.
 """
 
-import torch
+import contextlib
+import functools
 import os
 import sys
 
+@functools.lru_cache(maxsize=1)
 def detect_gpu():
-    """Detect GPU availability and return configuration."""
+    """Detect GPU availability and return configuration (cached per process)."""
+    import torch  # Deferred - importing torch initializes CUDA libraries
+    
     gpu_available = torch.cuda.is_available()
-    gpu_count = torch.cuda.device_count() if gpu_available else 0
     
     config = {
         'gpu_available': gpu_available,
-        'gpu_count': gpu_count,
+        'gpu_count': 0,
         'device': 'cuda' if gpu_available else 'cpu',
         'download_weights': gpu_available  # Only auto-download for GPU setups
     }
     
+    # Early out - skip further CUDA queries on CPU-only hosts
     if gpu_available:
+        config['gpu_count'] = torch.cuda.device_count()
         config['gpu_name'] = torch.cuda.get_device_name(0)
         config['gpu_memory'] = torch.cuda.get_device_properties(0).total_memory / 1024**3  # GB
     
@@ -45,14 +50,27 @@ def print_config(config):
 
 def main():
     """Main function to detect and configure GPU settings."""
+    # With --export, human-readable output goes to stderr and stdout carries
+    # shell export lines: eval "$(python gpu_detector.py --export)"
+    export = '--export' in sys.argv[1:]
     config = detect_gpu()
-    print_config(config)
+    
+    if export:
+        with contextlib.redirect_stdout(sys.stderr):
+            print_config(config)
+    else:
+        print_config(config)
     
     # Set environment variables for the pipeline
     os.environ['PIPELINE_DEVICE'] = config['device']
     os.environ['PIPELINE_GPU_AVAILABLE'] = str(config['gpu_available']).lower()
     os.environ['PIPELINE_DOWNLOAD_WEIGHTS'] = str(config['download_weights']).lower()
     
+    if export:
+        for name in ('PIPELINE_DEVICE', 'PIPELINE_GPU_AVAILABLE', 'PIPELINE_DOWNLOAD_WEIGHTS'):
+            print(f"export {name}={os.environ[name]}")
+        return 0
+    
     # Return exit code for shell scripts
     return 0 if config['gpu_available'] else 1
 
@@ -4,30 +4,109 @@ AWS S3 Handler for LaMa + ZITS Pipeline
 Handles S3 downloads, uploads, and AWS configuration
 """
 
-import boto3
+import functools
+import json
 import os
 import sys
-from pathlib import Path
-from botocore.exceptions import ClientError, NoCredentialsError
+import threading
+import time
+
+# boto3/botocore are imported lazily - building them costs hundreds of ms at startup
+
+# Parallel (multipart / ranged GET) transfer settings shared by all S3 transfers
+UPLOAD_CONCURRENCY = 16
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+
+# Process-wide S3 client and transfer manager, built lazily on first use
+_client = None
+_transfer_config = None
+_transfer_manager = None
+_client_lock = threading.Lock()
+
+def _get_client(session=None):
+    """Return the shared S3 client, creating it on first use (from session if given)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            import boto3
+            from botocore.config import Config
+            # Reusing the caller's session avoids resolving its credentials a second time
+            session = session or boto3.Session()
+            # One pooled connection per transfer thread so connections aren't discarded
+            _client = session.client('s3', config=Config(max_pool_connections=UPLOAD_CONCURRENCY))
+        return _client
+
+def _get_transfer_config():
+    """Return the shared TransferConfig, creating it on first use."""
+    global _transfer_config
+    with _client_lock:
+        if _transfer_config is None:
+            from boto3.s3.transfer import TransferConfig
+            _transfer_config = TransferConfig(
+                max_concurrency=UPLOAD_CONCURRENCY,
+                multipart_threshold=MULTIPART_CHUNKSIZE,
+                multipart_chunksize=MULTIPART_CHUNKSIZE,
+                use_threads=True
+            )
+        return _transfer_config
+
+def _get_transfer_manager(s3_client):
+    """Return the shared TransferManager, creating it on first use."""
+    global _transfer_manager
+    config = _get_transfer_config()
+    with _client_lock:
+        if _transfer_manager is None:
+            from boto3.s3.transfer import create_transfer_manager
+            _transfer_manager = create_transfer_manager(s3_client, config)
+        return _transfer_manager
+
+def _requires_aws(fn):
+    """Return False from an S3Handler method when AWS is not configured."""
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        if not self.aws_available:
+            print(f"❌ {fn.__name__}: AWS not configured")
+            return False
+        return fn(self, *args, **kwargs)
+    return wrapper
 
 class S3Handler:
     def __init__(self):
         """Initialize S3 client with AWS credentials."""
+        import boto3
+        from botocore.exceptions import BotoCoreError
+        
+        self._transfer_config = _get_transfer_config()
+        
         try:
-            # Try to initialize S3 client
-            self.s3_client = boto3.client('s3')
-            
-            # Test credentials by listing buckets (this will fail if no creds)
-            self.s3_client.list_buckets()
-            self.aws_available = True
-            print("✅ AWS credentials configured successfully")
-            
-        except (NoCredentialsError, ClientError) as e:
+            # Resolve credentials without calling S3 (instance profiles still query
+            # the EC2 metadata service); the client reuses this session's credentials
+            session = boto3.Session()
+            self.aws_available = session.get_credentials() is not None
+        except BotoCoreError:
             self.aws_available = False
+        
+        if self.aws_available:
+            self.s3_client = _get_client(session)
+            print("✅ AWS credentials configured successfully")
+        else:
+            self.s3_client = None
             print("⚠️  AWS credentials not configured or invalid")
             print("   Set AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY environment variables")
             print("   Or use IAM roles/instance profiles on EC2")
     
+    @_requires_aws
+    def verify(self):
+        """Verify credentials against S3 (issues a ListBuckets request)."""
+        from botocore.exceptions import ClientError, NoCredentialsError
+        
+        try:
+            self.s3_client.list_buckets()
+            return True
+        except (NoCredentialsError, ClientError) as e:
+            print(f"❌ AWS credential check failed: {str(e)}")
+            return False
+    
     def parse_s3_url(self, s3_url):
         """Parse S3 URL to extract bucket and key."""
         if not s3_url.startswith('s3://'):
@@ -45,12 +124,9 @@ class S3Handler:
         
         return bucket, key
     
+    @_requires_aws
     def download_file(self, s3_url, local_path):
         """Download file from S3 to local path."""
-        if not self.aws_available:
-            print("❌ Cannot download from S3 - AWS not configured")
-            return False
-        
         try:
             bucket, key = self.parse_s3_url(s3_url)
             
@@ -60,7 +136,7 @@ class S3Handler:
             print(f"📥 Downloading from S3: {s3_url}")
             print(f"   Target: {local_path}")
             
-            self.s3_client.download_file(bucket, key, local_path)
+            self.s3_client.download_file(bucket, key, local_path, Config=self._transfer_config)
             
             # Verify file was downloaded
             if os.path.exists(local_path):
@@ -75,12 +151,9 @@ class S3Handler:
             print(f"❌ S3 download failed: {str(e)}")
             return False
     
+    @_requires_aws
     def upload_file(self, local_path, s3_url):
         """Upload local file to S3."""
-        if not self.aws_available:
-            print("❌ Cannot upload to S3 - AWS not configured")
-            return False
-        
         try:
             bucket, key = self.parse_s3_url(s3_url)
             
@@ -92,7 +165,7 @@ class S3Handler:
             print(f"📤 Uploading to S3: {s3_url}")
             print(f"   Source: {local_path} ({file_size / 1024 / 1024:.1f} MB)")
             
-            self.s3_client.upload_file(local_path, bucket, key)
+            self.s3_client.upload_file(local_path, bucket, key, Config=self._transfer_config)
             print("✅ Upload completed successfully")
             return True
             
@@ -100,16 +173,14 @@ class S3Handler:
             print(f"❌ S3 upload failed: {str(e)}")
             return False
     
-    def upload_directory(self, local_dir, s3_base_url):
-        """Upload entire directory to S3."""
-        if not self.aws_available:
-            print("❌ Cannot upload to S3 - AWS not configured")
-            return False
-        
+    @_requires_aws
+    def upload_directory(self, local_dir, s3_base_url, manifest_path=None):
+        """Upload entire directory to S3, optionally recording each result in a JSONL manifest."""
         try:
             bucket, base_key = self.parse_s3_url(s3_base_url)
             
-            uploaded_files = 0
+            # Collect all files first so they can be uploaded in parallel
+            uploads = []
             for root, dirs, files in os.walk(local_dir):
                 for file in files:
                     local_file_path = os.path.join(root, file)
@@ -117,13 +188,62 @@ class S3Handler:
                     # Calculate relative path for S3 key
                     relative_path = os.path.relpath(local_file_path, local_dir)
                     s3_key = f"{base_key}/{relative_path}".replace('\\', '/')
-                    
+                    uploads.append((local_file_path, s3_key))
+            
+            total_files = len(uploads)
+            print(f"📤 Uploading {total_files} files to {s3_base_url}")
+            
+            # The manifest is best-effort - problems writing it never stop the uploads
+            manifest = None
+            if manifest_path:
+                try:
+                    manifest = open(manifest_path, 'w')
+                    print(f"   Manifest: {manifest_path}")
+                except OSError as e:
+                    print(f"   ⚠️  Cannot write upload manifest {manifest_path}: {str(e)}")
+            
+            try:
+                # The TransferManager's own thread pool runs the uploads concurrently
+                manager = _get_transfer_manager(self.s3_client)
+                futures = [
+                    (manager.upload(local_file_path, bucket, s3_key), local_file_path, s3_key)
+                    for local_file_path, s3_key in uploads
+                ]
+                
+                uploaded_files = 0
+                done_files = 0
+                last_report = time.monotonic()
+                for future, local_file_path, s3_key in futures:
+                    record = {'local_path': local_file_path, 'bucket': bucket, 'key': s3_key}
                     try:
-                        self.s3_client.upload_file(local_file_path, bucket, s3_key)
+                        future.result()
                         uploaded_files += 1
-                        print(f"   📤 Uploaded: {relative_path}")
+                        record['status'] = 'ok'
                     except Exception as e:
-                        print(f"   ❌ Failed to upload {relative_path}: {str(e)}")
+                        record['status'] = 'failed'
+                        record['error'] = str(e)
+                        print(f"   ❌ Failed to upload {local_file_path}: {str(e)}")
+                    if manifest:
+                        try:
+                            manifest.write(json.dumps(record) + '\n')
+                        except OSError as e:
+                            print(f"   ⚠️  Upload manifest write failed, disabling it: {str(e)}")
+                            manifest.close()
+                            manifest = None
+                    done_files += 1
+                    
+                    # Throttle progress output to about once per second
+                    now = time.monotonic()
+                    if now - last_report >= 1.0 or done_files == total_files:
+                        print(f"   📤 Progress: {done_files}/{total_files} files")
+                        last_report = now
+            finally:
+                # Close the manifest even if the upload loop raises
+                if manifest:
+                    try:
+                        manifest.close()
+                    except OSError as e:
+                        print(f"   ⚠️  Upload manifest write failed: {str(e)}")
             
             print(f"✅ Directory upload completed: {uploaded_files} files")
             return uploaded_files > 0
@@ -132,10 +252,10 @@ class S3Handler:
             print(f"❌ Directory upload failed: {str(e)}")
             return False
     
+    @_requires_aws
     def check_file_exists(self, s3_url):
         """Check if file exists in S3."""
-        if not self.aws_available:
-            return False
+        from botocore.exceptions import ClientError
         
         try:
             bucket, key = self.parse_s3_url(s3_url)
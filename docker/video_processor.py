@@ -4,18 +4,69 @@ Video Processor for LaMa + ZITS Pipeline
 Handles MP4 to frame extraction and frame to MP4 conversion
 """
 
-import cv2
+import functools
 import numpy as np
 import os
 import subprocess
 import sys
-from pathlib import Path
+
+def _list_png_files(directory):
+    """Return sorted PNG file names in a directory using a single scandir pass."""
+    with os.scandir(directory) as entries:
+        return sorted(e.name for e in entries if e.is_file() and e.name.endswith('.png'))
+
+def _gpu_available():
+    """Check for an NVIDIA GPU without importing torch."""
+    env_flag = os.environ.get('PIPELINE_GPU_AVAILABLE')
+    if env_flag is not None:
+        return env_flag.lower() == 'true'
+    return os.path.exists('/dev/nvidia0')
+
+@functools.lru_cache(maxsize=1)
+def _nvidia_video_available():
+    """Check that NVENC/NVDEC actually work with a one-frame test encode (probed once)."""
+    # Skip the test encode entirely on hosts without a GPU
+    if not _gpu_available():
+        return False
+    
+    # h264_nvenc is listed by distro FFmpeg builds even without a GPU, and containers
+    # only get the NVIDIA video libraries when NVIDIA_DRIVER_CAPABILITIES includes video
+    cmd = [
+        'ffmpeg', '-hide_banner', '-nostats', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', 'nullsrc',
+        '-frames:v', '1', '-c:v', 'h264_nvenc',
+        '-f', 'null', '-'
+    ]
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30)
+        return result.returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
 
 class VideoProcessor:
     def __init__(self):
         """Initialize video processor."""
         self.supported_formats = ['.mp4', '.avi', '.mov', '.mkv']
     
+    # NVDEC/NVENC are used only when a test encode on the GPU succeeds; the probe
+    # runs on first encode/decode rather than at construction
+    @property
+    def hw_decode(self):
+        """Whether FFmpeg can decode on the GPU (-hwaccel cuda)."""
+        return _nvidia_video_available()
+    
+    @property
+    def hw_encoder(self):
+        """Default H.264 encoder - h264_nvenc when usable, else libx264."""
+        return 'h264_nvenc' if _nvidia_video_available() else 'libx264'
+    
+    def _encoder_args(self, codec):
+        """Return FFmpeg encoder arguments for the given codec at matching quality."""
+        if codec == 'h264_nvenc':
+            # NVENC constant-quality equivalent of -crf 18
+            return ['-c:v', codec, '-rc', 'vbr', '-cq', '18', '-b:v', '0', '-vsync', 'passthrough']
+        return ['-c:v', codec, '-crf', '18']  # High quality
+    
     def extract_frames(self, video_path, output_dir, target_fps=None):
         """Extract frames from MP4 video using FFmpeg."""
         try:
@@ -32,40 +83,44 @@ class VideoProcessor:
             print(f"   FPS: {video_info['fps']}")
             print(f"   Duration: {video_info['duration']:.1f}s")
             
+            # Resize for processing, dropping frames in the same filter graph if an FPS is specified
+            video_filter = 'scale=256:256:flags=fast_bilinear'
+            if target_fps:
+                video_filter = f'fps={target_fps},{video_filter}'
+            
             # Build FFmpeg command
             cmd = [
-                'ffmpeg', '-i', video_path,
-                '-vf', 'scale=256:256',  # Resize for processing
+                'ffmpeg', '-nostats', '-loglevel', 'error',  # Only emit errors
+                *(['-hwaccel', 'cuda'] if self.hw_decode else []),  # GPU decode
+                '-i', video_path,
+                '-vf', video_filter,
                 '-q:v', '2',  # High quality
                 f'{output_dir}/frame_%05d.png'
             ]
             
-            # Add FPS filter if specified
-            if target_fps:
-                cmd.insert(-2, '-r')
-                cmd.insert(-1, str(target_fps))
-            
             # Run FFmpeg
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
             
             if result.returncode == 0:
                 # Count extracted frames
-                frame_count = len([f for f in os.listdir(output_dir) if f.endswith('.png')])
+                with os.scandir(output_dir) as entries:
+                    frame_count = sum(1 for e in entries if e.is_file() and e.name.endswith('.png'))
                 print(f"✅ Extracted {frame_count} frames successfully")
                 return True
             else:
-                print(f"❌ Frame extraction failed: {result.stderr}")
+                print(f"❌ Frame extraction failed: {result.stderr.decode('utf-8', errors='replace')}")
                 return False
                 
         except Exception as e:
             print(f"❌ Frame extraction error: {str(e)}")
             return False
     
-    def create_video(self, frames_dir, output_path, fps=30, codec='libx264'):
+    def create_video(self, frames_dir, output_path, fps=30, codec=None):
         """Create MP4 video from frames using FFmpeg."""
+        codec = codec or self.hw_encoder
         try:
             # Check if frames exist
-            frame_files = sorted([f for f in os.listdir(frames_dir) if f.endswith('.png')])
+            frame_files = _list_png_files(frames_dir)
             if not frame_files:
                 print(f"❌ No frames found in {frames_dir}")
                 return False
@@ -77,16 +132,16 @@ class VideoProcessor:
             # Build FFmpeg command
             cmd = [
                 'ffmpeg', '-y',  # Overwrite output file
+                '-nostats', '-loglevel', 'error',  # Only emit errors
                 '-framerate', str(fps),
                 '-i', f'{frames_dir}/frame_%05d.png',
-                '-c:v', codec,
+                *self._encoder_args(codec),
                 '-pix_fmt', 'yuv420p',
-                '-crf', '18',  # High quality
                 output_path
             ]
             
             # Run FFmpeg
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
             
             if result.returncode == 0:
                 # Check output file
@@ -97,8 +152,78 @@ class VideoProcessor:
                 else:
                     print("❌ Video creation failed - output file not found")
                     return False
+            elif codec != 'libx264':
+                # Hardware encoder unusable (e.g. driver lacks video capability) - retry on CPU
+                print(f"⚠️  {codec} encoding failed, falling back to libx264")
+                return self.create_video(frames_dir, output_path, fps, codec='libx264')
+            else:
+                print(f"❌ Video creation failed: {result.stderr.decode('utf-8', errors='replace')}")
+                return False
+                
+        except Exception as e:
+            print(f"❌ Video creation error: {str(e)}")
+            return False
+    
+    def create_video_from_arrays(self, frames_iter, output_path, fps=30, size=(256, 256), codec=None):
+        """Create MP4 video by piping in-memory BGR frames straight into FFmpeg."""
+        # Unlike create_video there is no libx264 retry: frames_iter may be single-pass
+        # and already consumed. NVENC is only picked after a successful test encode;
+        # pass codec='libx264' to force the CPU encoder.
+        codec = codec or self.hw_encoder
+        try:
+            width, height = size
+            
+            print("🎞️  Creating video from in-memory frames...")
+            print(f"   Output: {output_path}")
+            print(f"   FPS: {fps}")
+            
+            # Build FFmpeg command reading raw BGR frames from stdin
+            cmd = [
+                'ffmpeg', '-y',  # Overwrite output file
+                '-nostats', '-loglevel', 'error',  # Keep stderr small while we write to stdin
+                '-f', 'rawvideo',
+                '-pix_fmt', 'bgr24',
+                '-s', f'{width}x{height}',
+                '-r', str(fps),
+                '-i', '-',
+                *self._encoder_args(codec),
+                '-pix_fmt', 'yuv420p',
+                output_path
+            ]
+            
+            # Stream frames to FFmpeg - no intermediate PNG files
+            expected_shape = (height, width, 3)
+            proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+            frame_count = 0
+            finished = False
+            try:
+                try:
+                    for frame in frames_iter:
+                        frame = np.ascontiguousarray(frame)
+                        if frame.shape != expected_shape:
+                            raise ValueError(f"frame {frame_count} has shape {frame.shape}, expected {expected_shape}")
+                        if frame.dtype != np.uint8:
+                            raise ValueError(f"frame {frame_count} has dtype {frame.dtype}, expected uint8")
+                        proc.stdin.write(frame.tobytes())
+                        frame_count += 1
+                except BrokenPipeError:
+                    pass  # FFmpeg exited early; the error is reported below
+                _, stderr = proc.communicate()
+                finished = True
+            finally:
+                if not finished:
+                    # Don't leave FFmpeg running or a partial video behind
+                    proc.kill()
+                    proc.communicate()
+                    if os.path.exists(output_path):
+                        os.remove(output_path)
+            
+            if proc.returncode == 0 and os.path.exists(output_path):
+                file_size = os.path.getsize(output_path)
+                print(f"✅ Video created successfully from {frame_count} frames ({file_size / 1024 / 1024:.1f} MB)")
+                return True
             else:
-                print(f"❌ Video creation failed: {result.stderr}")
+                print(f"❌ Video creation failed: {stderr.decode('utf-8', errors='replace')}")
                 return False
                 
         except Exception as e:
@@ -129,10 +254,14 @@ class VideoProcessor:
                         break
                 
                 if video_stream:
+                    # Parse fraction such as "30000/1001" without eval
+                    num, _, den = video_stream['r_frame_rate'].partition('/')
+                    fps = int(num) / int(den) if den and int(den) else float(num)
+                    
                     return {
                         'width': int(video_stream['width']),
                         'height': int(video_stream['height']),
-                        'fps': eval(video_stream['r_frame_rate']),  # Evaluate fraction
+                        'fps': fps,
                         'duration': float(data['format']['duration'])
                     }
             
@@ -144,12 +273,14 @@ class VideoProcessor:
     
     def generate_subtitle_masks(self, frames_dir, masks_dir, subtitle_region=None):
         """Generate subtitle masks for frames (for demo/testing)."""
+        import cv2  # Only needed here - keeps extract/create startup light
+        
         try:
             if subtitle_region is None:
                 # Default subtitle region (bottom 20% of frame)
                 subtitle_region = (0, 205, 256, 256)  # x1, y1, x2, y2
             
-            frame_files = sorted([f for f in os.listdir(frames_dir) if f.endswith('.png')])
+            frame_files = _list_png_files(frames_dir)
             if not frame_files:
                 print(f"❌ No frames found in {frames_dir}")
                 return False
@@ -158,15 +289,18 @@ class VideoProcessor:
             
             print(f"🎭 Generating subtitle masks for {len(frame_files)} frames...")
             
-            for i, frame_file in enumerate(frame_files):
-                # Create mask
-                mask = np.zeros((256, 256), dtype=np.uint8)
-                x1, y1, x2, y2 = subtitle_region
-                cv2.rectangle(mask, (x1, y1), (x2, y2), 255, -1)
-                
+            # Create and encode the mask once - it is identical for every frame
+            mask = np.zeros((256, 256), dtype=np.uint8)
+            x1, y1, x2, y2 = subtitle_region
+            cv2.rectangle(mask, (x1, y1), (x2, y2), 255, -1)  # Clips and orders corners
+            _, mask_buffer = cv2.imencode('.png', mask)
+            mask_bytes = mask_buffer.tobytes()
+            
+            for frame_file in frame_files:
                 # Save mask with same numbering as frame
                 mask_file = frame_file.replace('frame_', 'mask_')
-                cv2.imwrite(f"{masks_dir}/{mask_file}", mask)
+                with open(f"{masks_dir}/{mask_file}", 'wb') as f:
+                    f.write(mask_bytes)
             
             print(f"✅ Generated {len(frame_files)} subtitle masks")
             return True
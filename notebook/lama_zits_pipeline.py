@@ -8,7 +8,6 @@ import cv2
 import numpy as np
 import os
 import sys
-from pathlib import Path
 
 def generate_test_data():
     """Generate synthetic test frames and masks."""
@@ -31,14 +30,23 @@ def generate_test_data():
     
     print(f"\n🎬 Generating {config['frame_count']} test frames...")
     
+    # Create the subtitle mask once - the region is identical for every frame
+    mask = np.zeros(config['frame_size'], dtype=np.uint8)
+    x1, y1, x2, y2 = config['subtitle_region']
+    cv2.rectangle(mask, (x1, y1), (x2, y2), 255, -1)  # Clips and orders corners
+    _, mask_buffer = cv2.imencode('.png', mask)
+    mask_bytes = mask_buffer.tobytes()
+    
+    # Create gradient background once - one color per row, broadcast across columns
+    background = np.full((*config['frame_size'], 3), 255, dtype=np.uint8)
+    y = np.arange(config['frame_size'][0])
+    rgb = np.stack([255 - y//3, 200 + y//8, 180 + y//4], axis=-1).astype(np.uint8)
+    background[:] = rgb[:, None, :]
+    
     # Generate synthetic frames with subtitles
     for i in range(config['frame_count']):
         # Create frame with gradient background
-        img = np.full((*config['frame_size'], 3), 255, dtype=np.uint8)
-        
-        # Add gradient effect
-        for y in range(config['frame_size'][0]):
-            img[y, :] = [255 - y//3, 200 + y//8, 180 + y//4]
+        img = background.copy()
         
         # Add main content text
         cv2.putText(img, f"Video Frame {i+1}", (50, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 2)
@@ -50,13 +58,9 @@ def generate_test_data():
         # Save frame
         cv2.imwrite(f"{config['input_dir']}/frame_{i:03d}.png", img)
 
-        # Create corresponding mask for subtitle area
-        mask = np.zeros(config['frame_size'], dtype=np.uint8)
-        x1, y1, x2, y2 = config['subtitle_region']
-        cv2.rectangle(mask, (x1, y1), (x2, y2), 255, -1)
-        
-        # Save mask
-        cv2.imwrite(f"{config['mask_dir']}/mask_{i:03d}.png", mask)
+        # Save pre-encoded mask for subtitle area
+        with open(f"{config['mask_dir']}/mask_{i:03d}.png", 'wb') as f:
+            f.write(mask_bytes)
 
     print(f"✅ Generated {config['frame_count']} frames and masks")
     print(f"   📁 Frames: {config['input_dir']}")
@@ -66,13 +70,20 @@ def generate_test_data():
 
 def check_environment():
     """Check the runtime environment."""
-    try:
-        import torch
-        gpu_available = torch.cuda.is_available()
-        device = 'cuda' if gpu_available else 'cpu'
-    except ImportError:
-        gpu_available = False
-        device = 'cpu'
+    # Reuse the device exported by `gpu_detector.py --export` (as the Docker
+    # entrypoint does) to avoid re-initializing CUDA; only trust a consistent pair
+    device = os.environ.get('PIPELINE_DEVICE')
+    gpu_flag = os.environ.get('PIPELINE_GPU_AVAILABLE')
+    if (device, gpu_flag) in (('cuda', 'true'), ('cpu', 'false')):
+        gpu_available = gpu_flag == 'true'
+    else:
+        try:
+            import torch
+            gpu_available = torch.cuda.is_available()
+            device = 'cuda' if gpu_available else 'cpu'
+        except ImportError:
+            gpu_available = False
+            device = 'cpu'
     
     in_docker = os.path.exists('/.dockerenv')
     
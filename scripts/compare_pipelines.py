@@ -5,7 +5,6 @@ Shows differences between old and new unified pipeline
 """
 
 import os
-from pathlib import Path
 
 def compare_pipelines():
     """Compare the different pipeline versions."""
@@ -35,10 +34,10 @@ def compare_pipelines():
     print("-" * 60)
     
     for feature, values in features.items():
-        basic, gpu_ready, unified = values
-        basic_str = "✅" if basic is True else "❌" if basic is False else str(basic)
-        gpu_str = "✅" if gpu_ready is True else "❌" if gpu_ready is False else str(gpu_ready)
-        unified_str = "✅" if unified is True else "❌" if unified is False else str(unified)
+        basic_str, gpu_str, unified_str = (
+            "✅" if value is True else "❌" if value is False else str(value)
+            for value in values
+        )
         
         print(f"{feature:<25} {basic_str:<10} {gpu_str:<12} {unified_str:<10}")
     
@@ -78,8 +77,11 @@ def check_old_pipelines():
             
             # Check for data
             input_dir = os.path.join(old_dir, "input_video")
-            if os.path.exists(input_dir) and os.listdir(input_dir):
-                print(f"      📁 Has data: {len(os.listdir(input_dir))} files")
+            if os.path.isdir(input_dir):
+                with os.scandir(input_dir) as entries:
+                    names = [e.name for e in entries if e.is_file()]
+                if names:
+                    print(f"      📁 Has data: {len(names)} files")
         else:
             print(f"   ❌ Not found: {old_dir}")
 